@@ -0,0 +1,131 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+import polars as pl
+
+from indexes import row_ranges
+from data_processing import summarize_stocks
+
+# Summaries are split by the sidebar filter columns so filtering them
+# gives the same result as filtering the raw rows first
+FILTER_KEYS = ["Industry", "Series Type"]
+# Category count tables are also split by Sector for the distribution charts
+CATEGORY_KEYS = [*FILTER_KEYS, "Sector"]
+# Columns that can be charted as a distribution, in picker order
+DISTRIBUTION_CATEGORIES = ["Industry", "Sector", "Series Type"]
+
+
+def filter_period(frame: pl.DataFrame, selected_sectors="All", selected_series="All") -> pl.DataFrame:
+    """Apply the sidebar Sector/Series selections to a summary or count table"""
+    if selected_sectors != "All":
+        frame = frame.filter(pl.col("Industry") == selected_sectors)
+    if selected_series != "All":
+        frame = frame.filter(pl.col("Series Type") == selected_series)
+    return frame
+
+
+def category_counts(categories: pl.DataFrame, category="Industry") -> pl.DataFrame:
+    """Merge (period, category) row counts into one row per category value, largest first"""
+    return (
+        categories
+        .drop_nulls(category)
+        .group_by(category)
+        .agg(pl.col("Rows").sum().alias("count"))
+        .sort(["count", category], descending=[True, False])
+    )
+
+
+def period_metrics(stocks: pl.DataFrame) -> dict:
+    """Total Stocks / Total Sectors / Average Change for a set of summaries"""
+    returns_count = stocks["Returns Count"].sum()
+    return {
+        "stocks": stocks["symbol"].n_unique(),
+        "sectors": stocks["Industry"].n_unique(),
+        "average": stocks["Returns Sum"].sum() / returns_count if returns_count else None,
+    }
+
+
+class AggregateStore:
+    """Per (day, symbol) and per (month, symbol) summaries plus per-period category counts
+
+    Built once per dataset. The Month view reads its month straight out of the
+    store and the Date Range view merges the daily summaries in its range,
+    so neither aggregates raw rows on a rerun.
+    """
+
+    def __init__(self, data: pl.DataFrame):
+        days = (
+            data
+            .lazy()
+            .with_columns(pl.col("Today's Date").dt.date().alias("Day"))
+            .drop_nulls("Day")
+        )
+
+        self.daily = summarize_stocks(
+            days,
+            by=["Day", "symbol", *CATEGORY_KEYS],
+            extra=[
+                # Float64 running sums so Average Change does not drift on Float32 Returns
+                pl.col("Returns").cast(pl.Float64).sum().alias("Returns Sum"),
+                pl.col("Returns").count().alias("Returns Count"),
+                pl.len().alias("Rows"),
+            ]
+        )
+        self.monthly = summarize_stocks(
+            self.daily.with_columns(pl.col("Day").dt.strftime('%B %Y').alias("Month")),
+            by=["Month", "symbol", *CATEGORY_KEYS],
+            extra=[pl.col("Returns Sum").sum(), pl.col("Returns Count").sum(), pl.col("Rows").sum()]
+        )
+
+        self.daily_categories = (
+            self.daily
+            .group_by(["Day", *CATEGORY_KEYS], maintain_order=True)
+            .agg(pl.col("Rows").sum())
+        )
+        self.monthly_categories = (
+            self.monthly
+            .group_by(["Month", *CATEGORY_KEYS], maintain_order=True)
+            .agg(pl.col("Rows").sum())
+        )
+
+        self._daily_days, self._daily_starts, self._daily_lengths = row_ranges(self.daily, "Day")
+        self._category_days, self._category_starts, self._category_lengths = row_ranges(self.daily_categories, "Day")
+        self._monthly_ranges = self._ranges_by_key(self.monthly, "Month")
+        self._monthly_category_ranges = self._ranges_by_key(self.monthly_categories, "Month")
+
+    @staticmethod
+    def _ranges_by_key(frame, column):
+        keys, starts, lengths = row_ranges(frame, column)
+        return dict(zip(keys, zip(starts, lengths)))
+
+    @staticmethod
+    def _slice_days(frame, days, starts, lengths, start_date, end_date):
+        first = bisect_left(days, start_date)
+        last = bisect_right(days, end_date)
+        if first >= last:
+            return frame.clear()
+        return frame.slice(starts[first], starts[last - 1] + lengths[last - 1] - starts[first])
+
+    def for_month(self, month: str):
+        """(stock summaries, category counts) for a month label such as 'January 2024'"""
+        stocks = self.monthly.clear()
+        categories = self.monthly_categories.clear()
+        if month in self._monthly_ranges:
+            stocks = self.monthly.slice(*self._monthly_ranges[month])
+            categories = self.monthly_categories.slice(*self._monthly_category_ranges[month])
+        return stocks, categories
+
+    def for_range(self, start_date: date, end_date: date):
+        """(stock summaries, category counts) for every day between two dates, both inclusive"""
+        stocks = self._slice_days(
+            self.daily, self._daily_days, self._daily_starts, self._daily_lengths, start_date, end_date
+        )
+        categories = self._slice_days(
+            self.daily_categories, self._category_days, self._category_starts, self._category_lengths,
+            start_date, end_date
+        )
+        return stocks, categories
+
+    def for_date(self, selected_date: date):
+        """(stock summaries, category counts) for a single trading day"""
+        return self.for_range(selected_date, selected_date)
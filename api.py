@@ -0,0 +1,142 @@
+"""Headless queries behind the four dashboard views
+
+Everything the sidebar selections do to the data, without Streamlit: pass a
+Dataset and the selections, get Polars frames and metrics back. The views in
+views.py only render these results, so the same queries can be batch
+computed, cached, benchmarked or served over HTTP.
+
+    dataset = data_loader.initial_dataset()
+    day = by_date(dataset, date(2024, 5, 2), sector="Banks", sort="Returns (High to Low)")
+    day.summary(), day.page(0, 25)
+    by_month(dataset, "May 2024").table()
+"""
+import polars as pl
+
+from aggregates import filter_period, period_metrics
+from data_processing import summarize_stocks
+from profiling import profiled
+from queries import StockQuery, SORT_OPTIONS
+
+# Month / date range table sort options, in sidebar order -> (column, descending)
+PERIOD_SORT_OPTIONS = {
+    "Returns (High to Low)": ("Max Returns", True),
+    "Occurrences (High to Low)": ("Occurrences", True),
+}
+
+# Card sort options for a single day; "None" keeps the file order
+DATE_SORT_OPTIONS = ["None", *SORT_OPTIONS]
+
+
+def _options(sectors, series) -> dict:
+    return {"sectors": ["All"] + sectors, "series": ["All"] + series}
+
+
+class DateResult:
+    """Stocks at a 52-week high on one day
+
+    `query` is the lazy StockQuery over the day's rows with the filters and
+    sort applied; `categories` are the day's category counts under the same
+    filters. `where` and `sort_by` return a new result over the same day.
+    """
+
+    def __init__(self, base: StockQuery, categories: pl.DataFrame, filters=("All", "All"), sort="None"):
+        self._base = base
+        self._categories = categories
+        self.filters = filters
+        self.sort = sort
+        self.query = base.where(*filters).sort_by(sort)
+        self.categories = filter_period(categories, *filters)
+
+    def where(self, sector="All", series="All") -> "DateResult":
+        return DateResult(self._base, self._categories, (sector, series), self.sort)
+
+    def sort_by(self, sort_option) -> "DateResult":
+        return DateResult(self._base, self._categories, self.filters, sort_option)
+
+    def options(self) -> dict:
+        """Sector and series choices of the whole day, before filtering"""
+        values = self._base.options("Industry", "Series Type")
+        return _options(values["Industry"], values["Series Type"])
+
+    def summary(self) -> dict:
+        """Row count and the Total Stocks / Total Sectors / Average Change metrics"""
+        return self.query.summary()
+
+    def page(self, offset, length) -> pl.DataFrame:
+        """One page of stock rows, sorted"""
+        return self.query.page(offset, length)
+
+    def summary_and_page(self, offset=0, length=None):
+        """(summary, page) in one pass, when the page is known up front; every row without a `length`"""
+        return self.query.summary_and_page(offset, length)
+
+    def rows(self) -> pl.DataFrame:
+        """Every matching stock row, sorted"""
+        return self.query.collect()
+
+
+class PeriodResult:
+    """Stocks at 52-week highs over a month or a date range
+
+    `stocks` holds the precomputed per-period summaries and `categories` the
+    category counts, both filtered; `table()` merges them into one row per
+    symbol in the selected sort order.
+    """
+
+    def __init__(self, stocks: pl.DataFrame, categories: pl.DataFrame, filters=("All", "All"),
+                 sort="Returns (High to Low)"):
+        self._stocks = stocks
+        self._categories = categories
+        self.filters = filters
+        self.sort = sort
+        self.stocks = filter_period(stocks, *filters)
+        self.categories = filter_period(categories, *filters)
+
+    def where(self, sector="All", series="All") -> "PeriodResult":
+        return PeriodResult(self._stocks, self._categories, (sector, series), self.sort)
+
+    def sort_by(self, sort_option) -> "PeriodResult":
+        return PeriodResult(self._stocks, self._categories, self.filters, sort_option)
+
+    def options(self) -> dict:
+        """Sector and series choices of the whole period, before filtering"""
+        sectors = self._stocks["Industry"].drop_nulls().unique().to_list()
+        series = self._stocks["Series Type"].drop_nulls().unique().to_list()
+        return _options(sorted(sectors), sorted(series))
+
+    def metrics(self) -> dict:
+        """Total Stocks / Total Sectors / Average Change"""
+        return period_metrics(self.stocks)
+
+    @profiled("period.table")
+    def table(self) -> pl.DataFrame:
+        """One row per symbol, sorted by the selected option (Occurrences by default)"""
+        column, descending = PERIOD_SORT_OPTIONS.get(self.sort, PERIOD_SORT_OPTIONS["Occurrences (High to Low)"])
+        return summarize_stocks(self.stocks).sort(column, descending=descending, nulls_last=True)
+
+
+def by_date(dataset, day, sector="All", series="All", sort="None") -> DateResult:
+    """The stock rows of one trading day, joined with their company profiles
+
+    The join runs once here; the options, summary and pages all read its result.
+    """
+    base = StockQuery(dataset.date_index.for_date(dataset.facts, day)).with_companies(dataset.companies).cached()
+    _, categories = dataset.aggregates.for_date(day)
+    return DateResult(base, categories, (sector, series), sort)
+
+
+def by_month(dataset, month: str, sector="All", series="All", sort="Returns (High to Low)") -> PeriodResult:
+    """Summaries for a month label such as 'January 2024' (see dataset.date_index.months)"""
+    stocks, categories = dataset.aggregates.for_month(month)
+    return PeriodResult(stocks, categories, (sector, series), sort)
+
+
+def by_range(dataset, start, end, sector="All", series="All", sort="Returns (High to Low)") -> PeriodResult:
+    """Summaries for every trading day between two dates, both inclusive"""
+    stocks, categories = dataset.aggregates.for_range(start, end)
+    return PeriodResult(stocks, categories, (sector, series), sort)
+
+
+def by_symbol(dataset, symbol: str) -> pl.DataFrame:
+    """Every day a symbol made a 52-week high, latest first (the order SymbolIndex keeps)"""
+    return dataset.symbol_index.for_symbol(symbol)
@@ -0,0 +1,22 @@
+import streamlit as st
+
+from data_loader import start_refresher
+
+
+@st.cache_resource
+def dataset_refresher():
+    """The process-wide Refresher
+
+    cache_resource hands every session the same object instead of unpickling
+    a private copy of the data per rerun the way cache_data would.
+    """
+    return start_refresher()
+
+
+def load_dataset():
+    """The current Dataset; read it once per rerun and use its parts, or None if loading failed"""
+    try:
+        return dataset_refresher().current
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        return None
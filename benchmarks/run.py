@@ -0,0 +1,188 @@
+"""Offline benchmark of the load, filter, aggregate and render stages
+
+Generates a synthetic Data.csv (or uses --data), then times each stage the
+app runs on a rerun, without a Streamlit server:
+
+    python benchmarks/run.py --days 1250 --symbols 2000
+    python benchmarks/run.py --data Data.csv --json results.json
+
+Each stage reports its median wall time, rows per second and the peak
+resident memory it added on top of what the process held before it.
+"""
+import argparse
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import polars as pl  # noqa: E402
+
+import synthetic  # noqa: E402
+import data_loader  # noqa: E402
+import profiling  # noqa: E402
+from aggregates import category_counts, filter_period  # noqa: E402
+from components import create_distribution_chart, search_table_html, stock_card_html, stock_table_html  # noqa: E402
+from data_processing import summarize_stocks  # noqa: E402
+from queries import StockQuery  # noqa: E402
+
+PAGE_SIZE = 25
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), or the peak so far elsewhere"""
+    current = profiling.rss_bytes()
+    if current is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return current
+
+
+class PeakMemory:
+    """Samples RSS on a thread while the block runs; `added` is the peak above the starting RSS"""
+
+    def __init__(self, interval=0.002):
+        self.interval = interval
+        self.added = 0
+
+    def __enter__(self):
+        self._start = self._peak = rss_bytes()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(self.interval):
+            self._peak = max(self._peak, rss_bytes())
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+        self.added = max(self._peak, rss_bytes()) - self._start
+
+
+def measure(name, fn, rows, repeat):
+    """Run `fn` `repeat` times; the first run's memory and the median time are reported"""
+    times = []
+    result = None
+    peak = 0
+    for i in range(repeat):
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+        if i == 0:
+            peak = memory.added
+    seconds = statistics.median(times)
+    return result, {
+        "stage": name,
+        "seconds": seconds,
+        "rows": rows,
+        "rows_per_second": rows / seconds if seconds else None,
+        "peak_added_mb": peak / 2**20,
+    }
+
+
+def run(data_path, repeat=3):
+    """Time every stage on one Data.csv and return the result records"""
+    results = []
+
+    def stage(name, fn, rows, times=repeat):
+        value, record = measure(name, fn, rows, times)
+        results.append(record)
+        return value
+
+    with tempfile.TemporaryDirectory() as cache:
+        # Load
+        raw = stage("load: eager read_csv + preprocess", lambda: data_loader.read_source(data_path), 0)
+        total = raw.height
+        results[-1].update(rows=total, rows_per_second=total / results[-1]["seconds"])
+        stage("load: snapshot rebuild (streaming)",
+              lambda: data_loader.rebuild_snapshot(data_path, cache)[0], total)
+        df = stage("load: warm snapshot read (mmap)", lambda: data_loader.read_snapshot(cache)[0], total)
+        dataset = stage("load: dataset build (split + indexes + aggregates)",
+                        lambda: data_loader.Dataset(df, data_loader.dataset_version(df)), total, times=1)
+
+        facts, companies = dataset.facts, dataset.companies
+        date_index, aggregates = dataset.date_index, dataset.aggregates
+        busiest = max(zip(date_index.days, date_index.starts, date_index.ends), key=lambda d: d[2] - d[1])[0]
+        month = date_index.months[len(date_index.months) // 2]
+        first, last = date_index.min_date, date_index.max_date
+        sector = companies["Industry"].drop_nulls().first()
+
+        # Filter
+        day_rows = date_index.for_date(facts, busiest).height
+        query = StockQuery(date_index.for_date(facts, busiest)).with_companies(companies).where(sector, "All")
+        stage("filter: day -> companies -> sector -> top-k page",
+              lambda: query.sort_by("Returns (High to Low)").page(0, PAGE_SIZE), day_rows)
+        month_stocks, month_categories = aggregates.for_month(month)
+        stage("filter: month summaries + sector", lambda: filter_period(month_stocks, sector), month_stocks.height)
+        range_stocks, range_categories = aggregates.for_range(first, last)
+        stage("filter: full range summaries + sector",
+              lambda: filter_period(aggregates.for_range(first, last)[0], sector), range_stocks.height)
+        symbol = dataset.symbol_index.symbols[0]
+        timeline = stage("filter: symbol timeline", lambda: dataset.symbol_index.for_symbol(symbol), 0)
+        results[-1].update(rows=timeline.height, rows_per_second=timeline.height / results[-1]["seconds"])
+
+        # Aggregate
+        month_table = stage("aggregate: month table (summarize + sort)",
+                            lambda: summarize_stocks(month_stocks).sort("Max Returns", descending=True, nulls_last=True),
+                            month_stocks.height)
+        range_table = stage("aggregate: full range table (summarize + sort)",
+                            lambda: summarize_stocks(range_stocks).sort("Occurrences", descending=True),
+                            range_stocks.height)
+        stage("aggregate: range category counts", lambda: category_counts(range_categories, "Industry"),
+              range_categories.height)
+
+        # Render
+        page = query.sort_by("Returns (High to Low)").page(0, PAGE_SIZE)
+        stage("render: page of stock cards",
+              lambda: "".join(stock_card_html(row) for row in page.iter_rows(named=True)), page.height)
+        stage("render: month table HTML", lambda: stock_table_html(month_table), month_table.height)
+        stage("render: full range table HTML", lambda: stock_table_html(range_table), range_table.height)
+        stage("render: search table HTML", lambda: search_table_html(timeline), timeline.height)
+        counts = category_counts(month_categories, "Industry")
+        stage("render: distribution chart JSON",
+              lambda: create_distribution_chart(counts, "Industry").to_json(), counts.height)
+
+    return results
+
+
+def report(results):
+    print(f"{'stage':<52} {'time':>10} {'rows':>10} {'rows/s':>12} {'peak +MB':>9}")
+    for r in results:
+        rate = f"{r['rows_per_second']:,.0f}" if r["rows_per_second"] else "-"
+        print(f"{r['stage']:<52} {r['seconds'] * 1000:>8.1f}ms {r['rows']:>10,} {rate:>12} {r['peak_added_mb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", help="benchmark this Data.csv instead of a synthetic one")
+    parser.add_argument("--days", type=int, default=250, help="synthetic trading days")
+    parser.add_argument("--symbols", type=int, default=2000, help="synthetic symbols")
+    parser.add_argument("--daily-fraction", type=float, default=0.2, help="share of symbols listed each day")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (median time is reported)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        data_path = args.data
+        if data_path is None:
+            data_path = Path(scratch) / "Data.csv"
+            rows = synthetic.write(data_path, args.days, args.symbols, args.daily_fraction)
+            print(f"Synthetic Data.csv: {args.days} days x {args.symbols} symbols, {rows:,} rows")
+        results = run(data_path, args.repeat)
+
+    report(results)
+    print(f"Process peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"polars": pl.__version__, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
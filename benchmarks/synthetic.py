@@ -0,0 +1,104 @@
+"""Synthetic Data.csv generator for the benchmarks
+
+Writes files with the Data.csv schema at any size, e.g. five years of trading
+days for 2,000 symbols:
+
+    python benchmarks/synthetic.py --days 1250 --symbols 2000 --out /tmp/Data.csv
+"""
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+
+COLUMNS = [
+    "symbol", "Today's Date", "ltp", "pChange", "LATESTPRICE", "P/E Ratio", "Market Cap",
+    "ROE", "ROCE", "Sector", "Industry", "Series Type", "About", "Days Since High",
+]
+SECTORS = ["Financial Services", "Information Technology", "Healthcare", "Consumer Goods", "Industrials", "Energy"]
+INDUSTRIES = [
+    "Banks", "IT Services", "Pharmaceuticals", "Auto Components", "Chemicals", "FMCG",
+    "Capital Goods", "Power", "Realty", "Textiles", "Cement", "Metals",
+]
+SERIES = ["EQ", "BE", "SM", "ST"]
+
+
+def trading_days(days: int, start=date(2020, 1, 1)):
+    """The first `days` weekdays from `start`"""
+    result = []
+    day = start
+    while len(result) < days:
+        if day.weekday() < 5:
+            result.append(day)
+        day += timedelta(days=1)
+    return result
+
+
+def generate(days=250, symbols=500, daily_fraction=0.2, seed=0) -> pl.DataFrame:
+    """A raw Data.csv frame: each trading day lists a random `daily_fraction` of the symbols
+
+    Every symbol keeps one profile (sector, industry, series, about text) like
+    the real file, and about 1% of the fields are empty.
+    """
+    rng = np.random.default_rng(seed)
+    per_day = max(1, int(symbols * daily_fraction))
+    calendar = trading_days(days)
+
+    # Row i belongs to calendar[i // per_day]; symbols are sampled per day
+    ids = np.concatenate([rng.choice(symbols, per_day, replace=False) for _ in calendar])
+    rows = len(ids)
+    dates = np.repeat([day.strftime("%d-%b-%y") for day in calendar], per_day)
+
+    ltp = np.round(rng.uniform(10, 5000, rows), 2)
+    latest = np.round(ltp * rng.uniform(0.7, 1.5, rows), 2)
+    pe = np.round(rng.uniform(5, 80, rows), 2).astype(str).astype(object)
+    pe[rng.random(rows) < 0.05] = "Book Value"
+
+    profile = np.arange(symbols)
+    frame = pl.DataFrame({
+        "symbol": [f"SYM{i:05d}" for i in ids],
+        "Today's Date": dates,
+        "ltp": ltp,
+        "pChange": np.round(rng.uniform(-5, 10, rows), 2),
+        "LATESTPRICE": latest,
+        "P/E Ratio": pe.astype(str),
+        "Market Cap": np.round(rng.uniform(1e8, 1e12, rows), 2),
+        "ROE": np.round(rng.uniform(-10, 40, rows), 2),
+        "ROCE": np.round(rng.uniform(-10, 40, rows), 2),
+        "Sector": np.array(SECTORS)[profile % len(SECTORS)][ids],
+        "Industry": np.array(INDUSTRIES)[profile % len(INDUSTRIES)][ids],
+        "Series Type": np.array(SERIES)[profile % len(SERIES)][ids],
+        "About": [f"SYM{i:05d} is a listed company. " * 8 for i in ids],
+        "Days Since High": rng.integers(0, 365, rows),
+    })
+
+    # Sprinkle missing values over the optional columns
+    optional = ["P/E Ratio", "Market Cap", "ROE", "ROCE", "Industry", "Series Type", "About"]
+    return frame.with_columns([
+        pl.when(pl.Series(rng.random(rows) < 0.01)).then(None).otherwise(pl.col(name)).alias(name)
+        for name in optional
+    ]).select(COLUMNS)
+
+
+def write(path, days=250, symbols=500, daily_fraction=0.2, seed=0) -> int:
+    """Generate and write a Data.csv file, returning its row count"""
+    frame = generate(days, symbols, daily_fraction, seed)
+    frame.write_csv(path)
+    return frame.height
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=250, help="trading days of history")
+    parser.add_argument("--symbols", type=int, default=500, help="distinct symbols")
+    parser.add_argument("--daily-fraction", type=float, default=0.2, help="share of symbols listed each day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="Data.csv")
+    args = parser.parse_args()
+
+    rows = write(args.out, args.days, args.symbols, args.daily_fraction, args.seed)
+    print(f"Wrote {rows:,} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utilities import format_metric_value, format_number
+from utilities import format_metric_value, format_number, format_fixed_expr, format_number_expr
 import polars as pl
+from aggregates import category_counts, DISTRIBUTION_CATEGORIES
+from profiling import profiled
 
-def create_metric_container(label, value, unit="", color="white", trend=None):
-    """Create an enhanced metric container with better typography and colors"""
+def metric_container_html(label, value, unit="", color="white", trend=None):
+    """HTML for an enhanced metric container with better typography and colors"""
     trend_color = {
         "up": "#22C55E",
         "down": "#EF4444",
@@ -17,274 +19,247 @@ def create_metric_container(label, value, unit="", color="white", trend=None):
         None: ""
     }
     
-    st.markdown(
-        f"""
-        <div style="background-color: rgba(30, 34, 45, 0.98); padding: 15px; border-radius: 8px; 
-                    margin: 8px 0; border: 1px solid rgba(255, 255, 255, 0.1);">
-            <div style="color: #A5B4FC; font-size: 13px; font-weight: 500; 
-                        letter-spacing: 0.5px; text-transform: uppercase;">{label}</div>
-            <div style="color: {color}; font-size: 20px; font-weight: 600; 
-                        margin-top: 8px; display: flex; align-items: center;">
-                <span style="color: {trend_color[trend]}">
-                    {value}{' ' + unit if unit else ''} {trend_icon[trend]}
-                </span>
-            </div>
-        </div>
-        """,
-        unsafe_allow_html=True
+    return (
+        '<div class="metric-container">'
+        f'<div class="metric-label">{label}</div>'
+        f'<div class="metric-value" style="color: {color};">'
+        f'<span style="color: {trend_color[trend]}">'
+        f"{value}{' ' + unit if unit else ''} {trend_icon[trend]}"
+        '</span></div></div>'
     )
 
-def create_stock_card(row):
-    """Create a stock card with simple background color based on performance"""
-    bg_color = "rgba(255, 255, 255, 0.5)"  # Default background color
-
-    st.markdown(f"""
-        <style>
-        .stock-card {{
-            background-color: {bg_color};
-            border-radius: 12px;
-            padding: 5px;
-            margin-bottom: 24px;
-            border: 1px solid rgba(255, 255, 255, 1);
-        }}
-        .stock-header {{
-            display: flex;
-            align-items: center;
-            margin-bottom: 24px;
-        }}
-        .stock-title {{
-            font-size: 28px;
-            font-weight: 700;
-            color: #A5B4FC;
-        }}
-        </style>
-    """, unsafe_allow_html=True)
-
-    with st.container():
-        st.markdown('<div class="stock-card">', unsafe_allow_html=True)
-        
-        # Header Section
-        symbol = row['symbol']
-        col1, col2, col3 = st.columns([3, 1, 1])
-        with col1:
-            # Handle NaN values for Series Type, Sector, and Industry
-            # series_type = row.get('Series Type', 'N/A') if pl.notna(row.get('Series Type')) else 'N/A'
-            # sector = row.get('Sector', 'N/A') if pl.notna(row.get('Sector')) else 'N/A'
-            # industry = row.get('Industry', 'N/A') if pl.notna(row.get('Industry')) else 'N/A'
-            series_type = row.get('Series Type', 'N/A') if row.get('Series Type') is not None else 'N/A'
-            sector = row.get('Sector', 'N/A') if row.get('Sector') is not None else 'N/A'
-            industry = row.get('Industry', 'N/A') if row.get('Industry') is not None else 'N/A'
-            
-            st.markdown(f"""
-            <div class="stock-header">
-                <div>
-                    <div class="stock-title">
-                        <span style="display: flex; align-items: center; gap: 12px;">
-                            {symbol} <strong>({series_type})</strong>
-                            <a href="https://www.screener.in/company/{symbol}" target="_blank"
-                            style="color: #A5B4FC; font-size: 14px; text-decoration: none;">🔍 Screener</a>
-                            <a href="https://www.tradingview.com/chart/?symbol=NSE:{symbol}" target="_blank"
-                            style="color: #60A5FA; font-size: 14px; text-decoration: none;">📊 TradingView</a>
-                        </span>
-                    </div>
-                    <div>
-                        <span style="margin-right: 20px; color: #E2E8F0;">
-                            <strong>Sector:</strong> {sector}
-                        </span>
-                    </div>
-                    <div>
-                        <span style="color: #E2E8F0;">
-                            <strong>Industry:</strong> {industry}     
-                        </span>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        
-        with col2:
-            # Handle NaN values for price and price_change
-            # price = format_number(row['ltp']) if pl.notna(row['ltp']) else 'N/A'
-            # price_change = row['pChange'] if pl.notna(row['pChange']) else 0
-            price = format_number(row['ltp']) if row['ltp'] is not None else 'N/A'
-            price_change = row['pChange'] if row['pChange'] is not None else 0
-            price_color = "#22C55E" if price_change >= 0 else "#EF4444"
-            date_current = row["Today's Date"].strftime('%d-%b-%y')
-
-            
-            # Format the price change display properly
-            if row['pChange'] is not None:
-                price_change_display = f"{price_change:+.2f}% {' ↑' if price_change >= 0 else ' ↓'}"
-            else:
-                price_change_display = "N/A"
-                
-            st.markdown(f"""
-                <div style="text-align: right; width: 180%;">
-                    <div style="font-size: 30px; font-weight: 700; color: white;">{price}</div>
-                    <div style="font-size: 20px; font-weight: 600; color: {price_color};">
-                        {price_change_display}
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-
-        # Metrics Grid
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Safely handle potentially missing or NaN values
-            # market_cap = format_number(row.get('Market Cap')) if pl.notna(row.get('Market Cap')) else 'N/A'
-            
-            # days_since_high = format_metric_value(row.get('Days Since High')) if pl.notna(row.get('Days Since High')) else 'N/A'
-
-            market_cap = format_number(row.get('Market Cap')) if row.get('Market Cap') is not None else 'N/A'
-            days_since_high = format_metric_value(row.get('Days Since High')) if row.get('Days Since High') is not None else 'N/A'
-            
-            create_metric_container("Market Cap", market_cap, color="#A5B4FC")
-            create_metric_container("Days Since New High", days_since_high, color="#BAE6FD")
-
-
-        with col2:
-            # Safely handle potentially missing or NaN values
-            pe_ratio = format_metric_value(row.get('P/E Ratio')) if row.get('P/E Ratio') is not None else 'N/A'
-            roe = format_metric_value(row.get('ROE')) if row.get('ROE') is not None else 'N/A'
-
-            
-            create_metric_container("Stock P/E", pe_ratio, color="#93C5FD")
-            create_metric_container("ROE", roe, unit="%", color="#FDA4AF")
-
-        with col3:
-            # Safely handle potentially missing or NaN values
-            ltp_1 = format_number(row.get('LATESTPRICE')) if row.get('LATESTPRICE') is not None else 'N/A'
-            returns = row.get('Returns') if row.get('Returns') is not None else 'N/A'
-
-            # st.display(df['Latest Price'])
-
-            # Handle display for returns
-            if returns is not None:
-                # returns_color = "#22C55E" if returns >= 0 else "#EF4444"
-                try:
-                    returns_value = round(float(returns),2)
-                    returns_color = "#22C55E" if returns_value >= 0 else "#EF4444"
-                    returns_icon = "↑" if returns_value >= 0 else "↓"
-
-                except ValueError: 
-                    returns_color = "#D1D5DB"
-                    returns_icon = '↑'  # Gray color for invalid or missing returns
-
-                # returns_icon = "↑" if returns >= 0 else "↓"
-                
-                returns_display = f'(<span style="color:{returns_color};">{returns}% {returns_icon}</span>)'
-            else:
-                returns_display = '(N/A)'
-
-            create_metric_container(
-                "Latest Price & Returns",
-                f'<span style="color:white;">{ltp_1}</span> {returns_display}',
-                color="white"
-            )
-
-            # Safely handle potentially missing or NaN values
-            # roce = format_metric_value(row.get('ROCE')) if pl.notna(row.get('ROCE')) else 'N/A'
-            roce = format_metric_value(row.get('ROCE')) if row.get('ROCE') is not None else 'N/A'    
-            create_metric_container("ROCE", roce, unit="%")
-
-        # About Section
-        if 'About' in row and str(row['About']) != 'nan':
-            st.markdown(f"""
-                <div style="margin-top: 20px; padding: 16px; background: rgba(30, 41, 59, 0.4); 
-                            border-radius: 8px; border: 1px solid rgba(255, 255, 255, 0.1);">
-                    <div style="color: #A5B4FC; font-size: 16px; font-weight: 600; margin-bottom: 8px;">About</div>
-                    <div style="color: #FFFFFF; font-size: 20px; line-height: 1.6;">{row['About']}</div>
-                </div>
-            """, unsafe_allow_html=True)
-
-        st.markdown("</div>", unsafe_allow_html=True)
-
-def create_sector_chart(filtered_data):
-    """Create an enhanced sector distribution chart with proper NaN handling"""
-    # Drop NaN values before counting sectors
-    sector_counts = filtered_data['Sector'].drop_nulls().value_counts()
-    
-    if sector_counts.empty:
-        # Return empty chart with message if no valid sectors
-        fig = go.Figure()
-        fig.add_annotation(
-            text="No sector data available",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5,
-            showarrow=False,
-            font=dict(color="white", size=16)
+def stock_card_html(row):
+    """HTML for one stock card (header, price, metrics grid and About section)"""
+    symbol = row['symbol']
+
+    # Handle missing values for Series Type, Sector, and Industry
+    series_type = row.get('Series Type', 'N/A') if row.get('Series Type') is not None else 'N/A'
+    sector = row.get('Sector', 'N/A') if row.get('Sector') is not None else 'N/A'
+    industry = row.get('Industry', 'N/A') if row.get('Industry') is not None else 'N/A'
+
+    header = (
+        '<div class="stock-header"><div>'
+        '<div class="stock-title"><span class="stock-title-links">'
+        f'{symbol} <strong>({series_type})</strong>'
+        f'<a href="https://www.screener.in/company/{symbol}" target="_blank" '
+        'class="stock-link stock-link-screener">🔍 Screener</a>'
+        f'<a href="https://www.tradingview.com/chart/?symbol=NSE:{symbol}" target="_blank" '
+        'class="stock-link stock-link-tradingview">📊 TradingView</a>'
+        '</span></div>'
+        f'<div><span class="stock-sector"><strong>Sector:</strong> {sector}</span></div>'
+        f'<div><span class="stock-industry"><strong>Industry:</strong> {industry}</span></div>'
+        '</div></div>'
+    )
+
+    # Handle missing values for price and price_change
+    price = format_number(row['ltp']) if row['ltp'] is not None else 'N/A'
+    price_change = row['pChange'] if row['pChange'] is not None else 0
+    price_color = "#22C55E" if price_change >= 0 else "#EF4444"
+
+    # Format the price change display properly
+    if row['pChange'] is not None:
+        price_change_display = f"{price_change:+.2f}% {' ↑' if price_change >= 0 else ' ↓'}"
+    else:
+        price_change_display = "N/A"
+
+    price_box = (
+        '<div class="stock-card-price">'
+        f'<div class="stock-price">{price}</div>'
+        f'<div class="stock-price-change" style="color: {price_color};">{price_change_display}</div>'
+        '</div>'
+    )
+
+    # Safely handle potentially missing values
+    market_cap = format_number(row.get('Market Cap')) if row.get('Market Cap') is not None else 'N/A'
+    days_since_high = format_metric_value(row.get('Days Since High')) if row.get('Days Since High') is not None else 'N/A'
+    pe_ratio = format_metric_value(row.get('P/E Ratio')) if row.get('P/E Ratio') is not None else 'N/A'
+    roe = format_metric_value(row.get('ROE')) if row.get('ROE') is not None else 'N/A'
+    roce = format_metric_value(row.get('ROCE')) if row.get('ROCE') is not None else 'N/A'
+    ltp_1 = format_number(row.get('LATESTPRICE')) if row.get('LATESTPRICE') is not None else 'N/A'
+    returns = row.get('Returns') if row.get('Returns') is not None else 'N/A'
+
+    # Handle display for returns
+    try:
+        returns_value = round(float(returns),2)
+        returns = returns_value
+        returns_color = "#22C55E" if returns_value >= 0 else "#EF4444"
+        returns_icon = "↑" if returns_value >= 0 else "↓"
+    except ValueError:
+        returns_color = "#D1D5DB"
+        returns_icon = '↑'  # Gray color for invalid or missing returns
+    returns_display = f'(<span style="color:{returns_color};">{returns}% {returns_icon}</span>)'
+
+    metrics = (
+        '<div class="stock-card-metrics">'
+        '<div>'
+        + metric_container_html("Market Cap", market_cap, color="#A5B4FC")
+        + metric_container_html("Days Since New High", days_since_high, color="#BAE6FD")
+        + '</div><div>'
+        + metric_container_html("Stock P/E", pe_ratio, color="#93C5FD")
+        + metric_container_html("ROE", roe, unit="%", color="#FDA4AF")
+        + '</div><div>'
+        + metric_container_html(
+            "Latest Price & Returns",
+            f'<span style="color:white;">{ltp_1}</span> {returns_display}',
+            color="white"
         )
-        fig.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(17, 24, 39, 0.7)',
-            plot_bgcolor='rgba(17, 24, 39, 0.7)',
-            height=400,
+        + metric_container_html("ROCE", roce, unit="%")
+        + '</div></div>'
+    )
+
+    # About Section
+    about = ''
+    if 'About' in row and str(row['About']) != 'nan':
+        about = (
+            '<div class="stock-about">'
+            '<div class="stock-about-title">About</div>'
+            f'<div class="stock-about-text">{row["About"]}</div>'
+            '</div>'
         )
-        return fig
-    
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=sector_counts.index,
-        y=sector_counts.values,
-        marker_color='rgb(165, 180, 252)',
-        marker_line_color='rgb(129, 140, 248)',
-        marker_line_width=1.5,
-        opacity=0.8,
-        text=sector_counts.values,
-        textposition='outside',
-        textfont=dict(color='#A5B4FC', size=12)  # Added text styling
-    ))
-    
-    # Calculate the maximum value to set appropriate y-axis range
-    max_value = sector_counts.values.max()
-    
-    fig.update_layout(
-        title={
-            'text': "Sector Distribution",
-            'y':0.95,
-            'x':0.5,
-            'xanchor': 'center',
-            'yanchor': 'top',
-            'font': {'size': 24, 'color': '#A5B4FC'}
-        },
-        xaxis_tickangle=-45,
-        template='plotly_dark',
-        showlegend=False,
-        xaxis_title="Sector",
-        yaxis_title="Number of Companies",
-        height=400,
-        margin=dict(t=100, b=80, l=60, r=40),  # Increased top margin
-        paper_bgcolor='rgba(17, 24, 39, 0.7)',
-        plot_bgcolor='rgba(17, 24, 39, 0.7)',
-        font={'color': '#9CA3AF'},
-        xaxis={'gridcolor': 'rgba(255, 255, 255, 0.1)'},
-        yaxis={
-            'gridcolor': 'rgba(255, 255, 255, 0.1)',
-            'range': [0, max_value * 1.2]  # Add 15% padding above highest bar
-        },
+
+    return (
+        '<div class="stock-card">'
+        f'<div class="stock-card-top"><div>{header}</div>{price_box}</div>'
+        f'{metrics}{about}'
+        '</div>'
     )
-    
-    return fig
 
-def create_industry_chart(filtered_data: pl.DataFrame):
-    """Create an enhanced sector distribution chart with proper NaN handling for Polars"""
-
-    # Drop NaN values before counting sectors
-    sector_counts = (
-        filtered_data
-        .select("Industry")
-        .drop_nulls()
-        .group_by("Industry")
-        .count()
-        .sort("count", descending=True)
+@profiled()
+def render_stock_cards(rows):
+    """Render a page of stock cards as a single markdown element (styles come from static/trackhigh.css)"""
+    cards = "".join(stock_card_html(row) for row in rows)
+    if cards:
+        st.markdown(cards, unsafe_allow_html=True)
+
+# Stock cards are rendered one page at a time so busy days don't flood the frontend
+CARD_PAGE_SIZES = [10, 25, 50, 100]
+DEFAULT_CARD_PAGE_SIZE = 25
+
+def page_window(total: int, key: str, selection="", page_sizes=CARD_PAGE_SIZES, default_size=DEFAULT_CARD_PAGE_SIZE):
+    """Render page size / page number controls for `total` rows and return the visible (offset, length)
+
+    The page size is keyed on `key` alone, so it survives a new date, sort or
+    filter; the page number is also keyed on `selection` and starts again at 1.
+    """
+    if total <= min(page_sizes):
+        return 0, total
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox(
+            "Cards per page",
+            page_sizes,
+            index=page_sizes.index(default_size) if default_size in page_sizes else 0,
+            key=f"{key}-page-size"
+        )
+
+    page_count = -(-total // page_size)
+    with col2:
+        # The selection and page count are part of the key so a new one starts again from page 1
+        page = st.number_input(
+            "Page", min_value=1, max_value=page_count, value=1, step=1,
+            key=f"{key}-page-{selection}-{page_count}"
+        )
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    with col3:
+        st.caption(f"Showing {start + 1}–{end} of {total} stocks (page {page} of {page_count})")
+
+    return start, page_size
+
+def _text(column):
+    """Column as text, with missing values shown as N/A like on the stock cards"""
+    return pl.col(column).cast(pl.Utf8).fill_null("N/A")
+
+def _html_table(df: pl.DataFrame, table_class, headers, cells) -> str:
+    """Build a whole table in one pass: every row's HTML is a string expression, joined once"""
+    head = "".join(f"<th>{header}</th>" for header in headers)
+    row = pl.concat_str([pl.lit("<tr>"), *[pl.format("<td>{}</td>", cell) for cell in cells], pl.lit("</tr>")])
+    body = df.select(row.str.join("").alias("body"))["body"].item() if df.height else ""
+    return f'<table class="{table_class}"><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table></div>'
+
+@profiled()
+def stock_table_html(stock_table: pl.DataFrame) -> str:
+    """Futuristic HTML table for the Most Frequent Stocks (symbol, Industry, Max Returns, Series Type, Occurrences)"""
+    returns = pl.col("Max Returns")
+    returns_html = (
+        pl.when(returns.is_null()).then(pl.lit('<span style="color: #64748b;">—</span>'))
+        .when(returns > 0).then(pl.format('<span class="returns-positive">+{}%</span>', format_fixed_expr(returns)))
+        .otherwise(pl.format('<span class="returns-negative">{}%</span>', format_fixed_expr(returns)))
+    )
+
+    return _html_table(
+        stock_table,
+        "futuristic-table",
+        ["Symbol", "Sector", "Returns", "Series", "Count"],
+        [
+            # Symbol with enhanced link
+            pl.format('<a href="https://www.screener.in/company/{}" target="_blank" class="stock-symbol">{}</a>',
+                      _text("symbol"), _text("symbol")),
+            # Sector with modern tag
+            pl.format('<span class="sector-tag">{}</span>', _text("Industry")),
+            returns_html,
+            # Series Type with badge
+            pl.format('<span class="series-badge">{}</span>', _text("Series Type")),
+            # Frequency counter
+            pl.format('<span class="frequency-counter">{}</span>', _text("Occurrences")),
+        ]
     )
 
+@profiled()
+def search_table_html(display_df: pl.DataFrame) -> str:
+    """Futuristic HTML table for a stock's timeline (date, price, returns)"""
+    change = pl.col("Returns")
+    change_html = (
+        pl.when(change.is_null()).then(pl.lit('<span class="change-neutral-search">❓ N/A</span>'))
+        .when(change > 0).then(pl.format('<span class="change-positive-search"> +{}%</span>', format_fixed_expr(change)))
+        .when(change < 0).then(pl.format('<span class="change-negative-search"> {}%</span>', format_fixed_expr(change)))
+        .otherwise(pl.format('<span class="change-neutral-search">➖ {}%</span>', format_fixed_expr(change)))
+    )
+
+    return _html_table(
+        display_df,
+        "search-stock-table",
+        ["📅 Date", "Stock Price", "Returns"],
+        [
+            # Date with enhanced styling
+            pl.format('<span class="date-badge">📅 {}</span>',
+                      pl.col("Today's Date").dt.strftime('%d %B %Y').fill_null("N/A")),
+            # Price with modern styling
+            pl.format('<span class="price-display">₹ {}</span>', format_number_expr(pl.col("ltp"))),
+            change_html,
+        ]
+    )
+
+# Largest categories shown as their own bar; the rest are summed into "Other"
+DISTRIBUTION_TOP_N = 20
+
+def top_n_with_other(counts: pl.DataFrame, category: str, top_n=DISTRIBUTION_TOP_N) -> pl.DataFrame:
+    """Keep the `top_n` largest (category, count) rows and sum the remainder into an "Other (N more)" row
+
+    The count in the label keeps the bucket apart from a real category named
+    "Other", which Plotly would otherwise merge into the same bar.
+    """
+    counts = counts.sort(["count", category], descending=[True, False])
+    if counts.height <= top_n:
+        return counts
+
+    rest = counts.slice(top_n)
+    label = f"Other ({rest.height} more)"
+    return pl.concat([
+        counts.head(top_n),
+        pl.DataFrame({category: [label], "count": [rest["count"].sum()]}, schema=counts.schema),
+    ])
+
+def create_distribution_chart(counts: pl.DataFrame, category: str, top_n=DISTRIBUTION_TOP_N):
+    """Create an enhanced distribution bar chart from precomputed (category, count) rows"""
+
     # If no data after dropping nulls
-    if sector_counts.height == 0:
+    if counts.height == 0:
         fig = go.Figure()
         fig.add_annotation(
-            text="No sector data available",
+            text=f"No {category.lower()} data available",
             xref="paper", yref="paper",
             x=0.5, y=0.5,
             showarrow=False,
@@ -298,27 +273,29 @@ def create_industry_chart(filtered_data: pl.DataFrame):
         )
         return fig
 
+    counts = top_n_with_other(counts, category, top_n)
+
     # Convert Polars DF to Python lists for Plotly
-    industries = sector_counts["Industry"].to_list()
-    counts = sector_counts["count"].to_list()
-    max_value = max(counts)
+    labels = counts[category].to_list()
+    values = counts["count"].to_list()
+    max_value = max(values)
 
     fig = go.Figure()
     fig.add_trace(go.Bar(
-        x=industries,
-        y=counts,
+        x=labels,
+        y=values,
         marker_color='rgb(165, 180, 252)',
         marker_line_color='rgb(129, 140, 248)',
         marker_line_width=1.5,
         opacity=0.8,
-        text=counts,
+        text=values,
         textposition='outside',
         textfont=dict(color='#A5B4FC', size=12)
     ))
 
     fig.update_layout(
         title={
-            'text': "Industry Distribution",
+            'text': f"{category} Distribution",
             'y': 0.95,
             'x': 0.5,
             'xanchor': 'center',
@@ -328,7 +305,7 @@ def create_industry_chart(filtered_data: pl.DataFrame):
         xaxis_tickangle=-45,
         template='plotly_dark',
         showlegend=False,
-        xaxis_title="Industry",
+        xaxis_title=category,
         yaxis_title="Number of Companies",
         height=400,
         margin=dict(t=100, b=80, l=60, r=40),
@@ -338,8 +315,58 @@ def create_industry_chart(filtered_data: pl.DataFrame):
         xaxis={'gridcolor': 'rgba(255, 255, 255, 0.1)'},
         yaxis={
             'gridcolor': 'rgba(255, 255, 255, 0.1)',
-            'range': [0, max_value * 1.2]
+            'range': [0, max_value * 1.2]  # Add 20% padding above highest bar
         },
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+# Number of chart figures kept; the least recently used one is evicted first
+CHART_CACHE_SIZE = 64
+
+@st.cache_resource(max_entries=CHART_CACHE_SIZE, show_spinner=False)
+def distribution_chart_figure(category, period, selected_sectors, selected_series, version, _categories: pl.DataFrame):
+    """Distribution chart for one (category, period, sector filter, series filter) selection
+
+    cache_resource keeps the built figure itself, so a rerun neither rebuilds
+    nor deserializes it; every session shares it, so treat it as read-only.
+
+    `version` is the dataset version, so a background refresh doesn't keep
+    serving charts of the data it replaced.
+
+    `_categories` is left out of the cache key (leading underscore) because it is
+    fully determined by the other arguments.
+    """
+    return create_distribution_chart(category_counts(_categories, category), category)
+
+@profiled()
+def cached_distribution_chart(category, period, filters, categories: pl.DataFrame, version=None):
+    """Distribution chart reused across reruns that only change unrelated widgets (e.g. the sort option)"""
+    selected_sectors, selected_series = filters
+    return distribution_chart_figure(category, period, selected_sectors, selected_series, version, categories)
+
+def render_distribution_chart(period, filters, categories: pl.DataFrame, key, version=None):
+    """Category picker plus the cached distribution chart for the current selection"""
+    category = st.radio("Distribution by", DISTRIBUTION_CATEGORIES, horizontal=True, key=f"{key}-distribution")
+    st.plotly_chart(cached_distribution_chart(category, period, filters, categories, version), use_container_width=True)
+
+def render_profiling_panel(profile):
+    """Sidebar debug panel listing the spans recorded for this rerun"""
+    if profile is None:
+        return
+    with st.sidebar.expander("⏱️ Profiling", expanded=True):
+        total = sum(span["ms"] for span in profile.spans if span["depth"] == 0)
+        st.caption(f"Run {profile.run_id}: {total:.1f} ms across top-level stages")
+        if not profile.spans:
+            return
+        table = pl.DataFrame([
+            {
+                "stage": "  " * span["depth"] + span["name"],
+                "ms": round(span["ms"], 2),
+                "rows in": span["rows_in"],
+                "rows out": span["rows_out"],
+                "RSS +MB": round(span["bytes"] / 2**20, 2) if span["bytes"] is not None else None,
+            }
+            for span in profile.spans
+        ])
+        st.dataframe(table, hide_index=True, use_container_width=True)
@@ -1,28 +1,609 @@
-import streamlit as st
+import hashlib
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
 import polars as pl
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+from indexes import DateIndex, SymbolIndex
+from aggregates import AggregateStore, CATEGORY_KEYS
+from refresher import Refresher
+from fetcher import fetch, download, CHUNK_SIZE
 # import pandas as pd
 
-@st.cache_data
-def load_data():
-    """Load and preprocess the data"""
+DATA_URL = "https://raw.githubusercontent.com/KrishMehta2004/TrackHigh_Data/refs/heads/main/Data.csv"
+
+# Point TRACKHIGH_DATA_SOURCE at a local copy of Data.csv to run offline
+DATA_SOURCE = os.environ.get("TRACKHIGH_DATA_SOURCE", DATA_URL)
+
+# On-disk snapshot of the preprocessed frame (Arrow IPC, memory-mapped on read)
+SNAPSHOT_DIR = Path(os.environ.get("TRACKHIGH_CACHE_DIR", ".trackhigh_cache"))
+# Immutable data files are named "snapshot-<generation>.arrow" and
+# "delta-<generation>-<n>.arrow"; snapshot.json says which ones are current
+SNAPSHOT_FILE = "snapshot.arrow"
+SNAPSHOT_LOCK = "refresh.lock"
+SNAPSHOT_META = "snapshot.json"
+# The source is staged here (remote ones via a resumable .part file) and parsed from disk
+DOWNLOAD_FILE = "source.csv"
+# HTTP validators kept in the snapshot metadata for conditional requests
+VALIDATOR_KEYS = ("etag", "last_modified")
+# Seconds before a snapshot of a remote source is considered stale
+SNAPSHOT_MAX_AGE = int(os.environ.get("TRACKHIGH_SNAPSHOT_MAX_AGE", 6 * 60 * 60))
+# Seconds between background checks of the source (conditional, so an unchanged one is cheap)
+REFRESH_INTERVAL = int(os.environ.get("TRACKHIGH_REFRESH_INTERVAL", 5 * 60))
+# Bump whenever preprocess() changes its output so old snapshots get rebuilt
+SNAPSHOT_VERSION = 7
+# Number of appended delta files kept before they are compacted into the base snapshot
+MAX_DELTA_PARTS = 30
+# Size of the window before the ingest offset that must be unchanged for an incremental append
+BOUNDARY_BYTES = 4096
+
+# Columns preprocess() adds, and raw text columns it parses itself
+DERIVED_COLUMNS = {"Returns"}
+TEXT_PARSED_COLUMNS = {"Today's Date", "P/E Ratio"}
+
+# Repeated strings are stored as dictionaries instead of one string per row
+CATEGORICAL_COLUMNS = ["symbol", "Industry", "Sector", "Series Type", "About"]
+# Ratios only ever shown to 2 decimals; prices and Market Cap stay Float64
+FLOAT32_COLUMNS = ["pChange", "Returns", "P/E Ratio", "ROE", "ROCE", "Days Since High"]
+# Per-company profile kept once per symbol in the company table, not on every daily row.
+# What is left is the daily facts table: date, symbol, ltp, pChange, LATESTPRICE,
+# Returns and Days Since High.
+COMPANY_COLUMNS = ["About", "Sector", "Industry", "Series Type", "ROE", "ROCE", "Market Cap", "P/E Ratio"]
+
+
+def prepare(df):
+    """Parse dates, compute Returns, clean P/E Ratio and compact dtypes on a raw Data.csv frame
+
+    Row-wise only, so it runs per batch on a LazyFrame from scan_csv as well.
+    Rows whose date doesn't parse are dropped: no view can show them, and
+    kept at the end of the history they would split a day appended after them.
+    """
+    df = df.with_columns([
+        # Convert date column
+        pl.col("Today's Date").str.to_datetime(format="%d-%b-%y", strict=False),
+        # Calculate returns
+        ((pl.col("LATESTPRICE") - pl.col("ltp")) * 100 / pl.col("ltp")).round(2).alias("Returns"),
+        # Clean and convert P/E Ratio
+        pl.col("P/E Ratio").cast(pl.Utf8).str.replace("Book Value", "").cast(pl.Float64, strict=False)
+    ])
+    return compact(df.filter(pl.col("Today's Date").is_not_null()))
+
+
+def preprocess(df: pl.DataFrame) -> pl.DataFrame:
+    """prepare() a raw Data.csv frame and put it in date order"""
+    # Keep rows in date order so DateIndex can slice instead of filter
+    return prepare(df).sort("Today's Date", nulls_last=True, maintain_order=True)
+
+
+def compact(df):
+    """Cast repeated strings to Categorical and ratio columns to 32-bit numbers"""
+    casts = []
+    for name, dtype in df.collect_schema().items():
+        if name in CATEGORICAL_COLUMNS and dtype == pl.String:
+            casts.append(pl.col(name).cast(pl.Categorical))
+        elif name in FLOAT32_COLUMNS and dtype == pl.Float64:
+            casts.append(pl.col(name).cast(pl.Float32))
+        elif name in FLOAT32_COLUMNS and dtype == pl.Int64:
+            casts.append(pl.col(name).cast(pl.Int32))
+    return df.with_columns(casts)
+
+
+def split_companies(df: pl.DataFrame):
+    """(daily facts, company table) with the COMPANY_COLUMNS moved to one row per symbol
+
+    Rows are in date order, so each company gets its latest non-null profile.
+    """
+    columns = [name for name in COMPANY_COLUMNS if name in df.columns]
+    if "symbol" not in df.columns:
+        return df, pl.DataFrame()
+
+    companies = (
+        df
+        .group_by("symbol")
+        .agg([pl.col(name).drop_nulls().last() for name in columns])
+        .sort("symbol")
+    )
+    return df.drop(columns), companies
+
+
+def with_companies(frame: pl.DataFrame, companies: pl.DataFrame, columns=None) -> pl.DataFrame:
+    """Join company profile columns (all of them by default) onto facts by symbol"""
+    columns = [name for name in (columns or COMPANY_COLUMNS) if name in companies.columns]
+    if not columns:
+        return frame
+    return frame.join(companies.select("symbol", *columns), on="symbol", how="left", maintain_order="left")
+
+
+def is_remote(source) -> bool:
+    """True if the source is a URL rather than a local file"""
+    return str(source).startswith(("http://", "https://"))
+
+
+def source_fingerprint(source) -> dict:
+    """Identify a source so a snapshot can tell whether it was built from it"""
+    if is_remote(source):
+        return {"source": str(source)}
+
+    path = Path(source).resolve()
+    stat = path.stat()
+    return {"source": str(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class SnapshotMismatch(Exception):
+    """The snapshot can't be extended from the source and needs a full rebuild"""
+
+
+def fetch_bytes(source, start=0) -> bytes:
+    """Return the raw bytes of the source from offset `start` to the end"""
+    if is_remote(source):
+        return fetch(source, start)[0]
+
+    with open(source, "rb") as f:
+        f.seek(start)
+        return f.read()
+
+
+def fetch_bytes_prefix(source, length: int) -> bytes:
+    """Return the first `length` bytes of the source"""
+    if is_remote(source):
+        return fetch(source, 0, length)[0]
+
+    with open(source, "rb") as f:
+        return f.read(length)
+
+
+def fetch_since(source, start, meta: dict):
+    """(bytes from `start`, validators) for an append, or (None, validators) if a remote source is unchanged"""
+    if is_remote(source):
+        return fetch(source, start, known={key: meta[key] for key in VALIDATOR_KEYS if key in meta})
+    return fetch_bytes(source, start), {}
+
+
+def complete_lines(raw: bytes) -> bytes:
+    """Cut a chunk of CSV after its last newline so half-written rows are left for next time"""
+    return raw[:raw.rfind(b"\n") + 1]
+
+
+def boundary_digest(raw: bytes) -> str:
+    """Digest of the bytes just before the ingested offset, used to detect rewritten history"""
+    return hashlib.sha1(raw).hexdigest()
+
+
+def map_ipc(path) -> pl.DataFrame:
+    """Open an uncompressed Arrow IPC file memory-mapped, skipping parsing entirely
+
+    Polars' own reader copies the file into process memory, so the mapping is
+    done through pyarrow (installed with Streamlit) and handed over without
+    rechunking; numeric and date columns stay views of the file's pages.
+    """
+    if pa is None:
+        return pl.read_ipc(path)
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    return pl.from_arrow(table, rechunk=False)
+
+
+def read_snapshot(directory=SNAPSHOT_DIR, attempts=3):
+    """Return (frame, metadata) for the stored snapshot, or (None, None) if there is none
+
+    The files are memory-mapped, so every process on the host that opens the
+    same snapshot shares one copy of it in the OS page cache.
+    """
+    directory = Path(directory)
+    meta_path = directory / SNAPSHOT_META
+    for _ in range(attempts):
+        if not meta_path.exists():
+            return None, None
+        try:
+            meta = json.loads(meta_path.read_text())
+            names = [meta.get("base", SNAPSHOT_FILE), *meta.get("parts", [])]
+            frames = [map_ipc(directory / name) for name in names]
+        except FileNotFoundError:
+            # Another process published a new snapshot and removed these files; read its metadata
+            continue
+        except (OSError, ValueError, pl.exceptions.PolarsError):
+            return None, None
+        return pl.concat(frames, rechunk=False), meta
+    return None, None
+
+
+@contextmanager
+def refresh_lock(directory=SNAPSHOT_DIR, wait=True):
+    """Inter-process lock so only one server process on the host ingests at a time
+
+    Yields False when `wait` is off and another process holds the lock.
+    Without fcntl (Windows) or a writable directory, it doesn't lock at all.
+    """
+    try:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        handle = open(Path(directory) / SNAPSHOT_LOCK, "a")
+    except OSError:
+        yield True
+        return
+
+    with handle:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def write_meta(meta: dict, directory=SNAPSHOT_DIR):
+    """Atomically replace the snapshot metadata"""
+    meta_tmp = Path(directory) / f"{SNAPSHOT_META}.tmp"
+    meta_tmp.write_text(json.dumps(meta))
+    os.replace(meta_tmp, Path(directory) / SNAPSHOT_META)
+
+
+def write_snapshot(df: pl.DataFrame, source, directory=SNAPSHOT_DIR, data_file=None, fingerprint=None, **ingest) -> dict:
+    """Persist a preprocessed frame and its metadata, replacing any previous snapshot atomically
+
+    `data_file` is an IPC file in `directory` that already holds `df` (streamed
+    there by stream_csv); it is moved into place instead of written again.
+    `fingerprint` is the source_fingerprint() taken before the source was
+    read; one taken afterwards could match rows that were never ingested.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    generation = f"{time.time_ns():x}"
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "rows": df.height,
+        "generation": generation,
+        "base": f"snapshot-{generation}.arrow",
+        "parts": [],
+        **ingest,
+        **(fingerprint or source_fingerprint(source)),
+    }
+
+    data_tmp = data_file or directory / f"{SNAPSHOT_FILE}.tmp"
+    if data_file is None:
+        df.write_ipc(data_tmp, compression="uncompressed")
+    os.replace(data_tmp, directory / meta["base"])
+    write_meta(meta, directory)
+
+    # Older bases and delta parts (now folded into the new base) are no longer
+    # referenced. Processes that mapped them keep their pages until they swap.
+    for stale in [*directory.glob("snapshot*.arrow"), *directory.glob("delta-*.arrow")]:
+        if stale.name != meta["base"]:
+            stale.unlink(missing_ok=True)
+
+    return meta
+
+
+def snapshot_is_fresh(meta, source, max_age=SNAPSHOT_MAX_AGE) -> bool:
+    """Check a snapshot's version and whether it still matches its source"""
+    if not meta or meta.get("version") != SNAPSHOT_VERSION:
+        return False
+
+    if is_remote(source):
+        return meta.get("source") == str(source) and time.time() - meta.get("created_at", 0) < max_age
+
+    try:
+        fingerprint = source_fingerprint(source)
+    except OSError:
+        # Local copy went away, keep serving what we have
+        return True
+    # Ingested up to the end of the file, not just stamped with its current size
+    if meta.get("offset") != fingerprint["size"]:
+        return False
+    return all(meta.get(key) == value for key, value in fingerprint.items())
+
+
+def parse_csv(raw, schema=None) -> pl.DataFrame:
+    """Parse raw Data.csv bytes (or a downloaded file's path) and preprocess them
+
+    With a `schema` (the snapshot's), every column is read as text and cast to it,
+    so a handful of new rows can't infer different dtypes than the full history.
+    """
+    csv = io.BytesIO(raw) if isinstance(raw, bytes) else raw
+    if schema is None:
+        return preprocess(pl.read_csv(csv))
+
+    df = pl.read_csv(csv, infer_schema=False)
+    if set(df.columns) != set(schema) - DERIVED_COLUMNS:
+        raise SnapshotMismatch("source columns changed")
+
+    casts = [
+        pl.col(name).cast(schema[name], strict=False)
+        for name in df.columns
+        if name not in TEXT_PARSED_COLUMNS and schema[name] != pl.String
+    ]
+    cast = df.with_columns(casts)
+    # A value that was present in the CSV but failed to cast means the dtype drifted
+    for name in (c.meta.output_name() for c in casts):
+        if cast[name].null_count() != df[name].null_count():
+            raise SnapshotMismatch(f"column {name!r} no longer fits its snapshot dtype")
+
+    return preprocess(cast).select(list(schema))
+
+
+def stage_source(source, directory=SNAPSHOT_DIR):
+    """Put the source's current bytes in the snapshot directory as a CSV file
+
+    Returns (path, HTTP validators, source fingerprint), with path None if the
+    directory isn't writable. Remote sources are streamed to disk; local ones
+    are copied up to the size in their fingerprint, so rows appended meanwhile
+    don't match it and are picked up by the next refresh.
+    """
+    fingerprint = source_fingerprint(source)
+    path = Path(directory) / DOWNLOAD_FILE
     try:
-        url = "https://raw.githubusercontent.com/KrishMehta2004/TrackHigh_Data/refs/heads/main/Data.csv"
-        df = pl.read_csv(url)
-
-        df = df.with_columns([
-            # Convert date column
-            pl.col("Today's Date").str.to_datetime(format="%d-%b-%y", strict=False),
-            # Calculate returns
-            ((pl.col("LATESTPRICE") - pl.col("ltp")) * 100 / pl.col("ltp")).round(2).alias("Returns"),
-            # Clean and convert P/E Ratio
-            pl.col("P/E Ratio").str.replace("Book Value", "").cast(pl.Float64, strict=False)
-        ])
-
-        df = df.with_columns(
-            pl.col("Today's Date").dt.strftime('%B %Y').alias("Month")
-        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None, {}, fingerprint
+    if is_remote(source):
+        return path, download(source, path), fingerprint
 
+    remaining = fingerprint["size"]
+    with open(source, "rb") as src, open(path, "wb") as dst:
+        while remaining and (chunk := src.read(min(CHUNK_SIZE, remaining))):
+            dst.write(chunk)
+            remaining -= len(chunk)
+    return path, {}, fingerprint
+
+
+def stream_csv(path, target) -> pl.DataFrame:
+    """Parse a CSV file in batches with the streaming engine straight into an IPC file
+
+    Memory stays bounded by a batch rather than the whole history. Data.csv
+    is appended in date order, so the result is normally already sorted; if
+    not, it is sorted once and rewritten.
+    """
+    prepare(pl.scan_csv(path)).sink_ipc(target, compression="uncompressed")
+    df = map_ipc(target)
+    if df["Today's Date"].is_sorted(nulls_last=True):
         return df
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return pl.DataFrame()
\ No newline at end of file
+
+    sorted_tmp = Path(f"{target}.sorted")
+    df.sort("Today's Date", nulls_last=True, maintain_order=True).write_ipc(sorted_tmp, compression="uncompressed")
+    os.replace(sorted_tmp, target)
+    return map_ipc(target)
+
+
+def rebuild_snapshot(source=DATA_SOURCE, directory=SNAPSHOT_DIR):
+    """Parse the whole source and write a fresh snapshot"""
+    path, known, fingerprint = stage_source(source, directory)
+    data_file = None
+    if path is not None:
+        # Only the header and the last few KB are read into memory here
+        size = path.stat().st_size
+        with open(path, "rb") as f:
+            header = f.readline()
+            f.seek(max(0, size - BOUNDARY_BYTES))
+            end = f.read()
+        data_file = Path(directory) / f"{SNAPSHOT_FILE}.stream"
+        df = stream_csv(path, data_file)
+        path.unlink(missing_ok=True)
+    else:
+        raw = fetch_bytes(source)
+        df = parse_csv(raw)
+        header, size, end = raw[:raw.find(b"\n") + 1], len(raw), raw[-BOUNDARY_BYTES:]
+
+    ingest = {
+        "header": header.decode("utf-8", errors="replace"),
+        "offset": size,
+        "boundary": boundary_digest(end),
+        "last_date": _last_date(df),
+        **known,
+    }
+    try:
+        meta = write_snapshot(df, source, directory, data_file=data_file, fingerprint=fingerprint, **ingest)
+    except OSError:
+        # Read-only filesystem, the app still works without the snapshot
+        meta = None
+
+    return df, meta
+
+
+def append_snapshot(df: pl.DataFrame, meta: dict, source=DATA_SOURCE, directory=SNAPSHOT_DIR):
+    """Ingest only the rows added to the source since the snapshot was written
+
+    Raises SnapshotMismatch when the source was rewritten rather than appended to.
+    """
+    directory = Path(directory)
+    offset = meta.get("offset")
+    if not offset or "header" not in meta:
+        raise SnapshotMismatch("snapshot has no ingest position")
+
+    # Before reading: if the file grows meanwhile, the snapshot must not claim the new size
+    fingerprint = source_fingerprint(source)
+
+    # Re-read a small window before the offset to make sure history wasn't rewritten
+    window = min(BOUNDARY_BYTES, offset)
+    raw, known = fetch_since(source, offset - window, meta)
+    if raw is None:
+        # 304 Not Modified: nothing new upstream, the snapshot is fresh again
+        meta = {**meta, "created_at": time.time()}
+        write_meta(meta, directory)
+        return df, meta
+    if len(raw) < window or boundary_digest(raw[:window]) != meta.get("boundary"):
+        raise SnapshotMismatch("source history changed")
+    if not fetch_bytes_prefix(source, len(meta["header"].encode())) == meta["header"].encode():
+        raise SnapshotMismatch("source header changed")
+
+    tail = complete_lines(raw[window:])
+    meta = {**meta, **fingerprint, **known, "created_at": time.time()}
+    if not tail:
+        write_meta(meta, directory)
+        return df, meta
+
+    # lstrip: the previous ingest may have ended on a row without a trailing newline
+    new_rows = parse_csv(meta["header"].encode() + tail.lstrip(b"\r\n"), schema=df.schema)
+    consumed = raw[:window] + tail
+    if new_rows.height == 0:
+        # Only blank lines: move past them without adding a delta file
+        meta.update({"offset": offset + len(tail), "boundary": boundary_digest(consumed[-BOUNDARY_BYTES:])})
+        write_meta(meta, directory)
+        return df, meta
+
+    first_new = new_rows["Today's Date"].min()
+    if meta.get("last_date") and first_new.isoformat() < meta["last_date"]:
+        raise SnapshotMismatch("new rows are not in date order")
+
+    part = f"delta-{meta.get('generation', 0)}-{len(meta['parts']) + 1:05d}.arrow"
+    new_rows.write_ipc(directory / part, compression="uncompressed")
+
+    df = pl.concat([df, new_rows], rechunk=False)
+    meta.update({
+        "rows": df.height,
+        "parts": [*meta["parts"], part],
+        "offset": offset + len(tail),
+        "boundary": boundary_digest(consumed[-BOUNDARY_BYTES:]),
+        "last_date": _last_date(df),
+    })
+
+    # Fold the deltas back into one file once there are enough of them
+    if len(meta["parts"]) >= MAX_DELTA_PARTS:
+        ingest = {key: meta[key] for key in ("header", "offset", "boundary", "last_date", *VALIDATOR_KEYS) if key in meta}
+        return df, write_snapshot(df, source, directory, fingerprint=fingerprint, **ingest)
+
+    write_meta(meta, directory)
+    return df, meta
+
+
+def _last_date(df: pl.DataFrame):
+    last = df["Today's Date"].max() if df.height else None
+    return last.isoformat() if last is not None else None
+
+
+def read_source(source=DATA_SOURCE) -> pl.DataFrame:
+    """Download (or read) and preprocess the raw Data.csv"""
+    return parse_csv(fetch_bytes(source))
+
+
+def refresh_snapshot(source=DATA_SOURCE, directory=SNAPSHOT_DIR, incremental=True):
+    """Bring the snapshot up to date, appending new days when possible and rebuilding otherwise
+
+    Returns (frame, metadata); metadata is None when the snapshot couldn't be written.
+    """
+    df, meta = read_snapshot(directory)
+    if incremental and df is not None and meta.get("version") == SNAPSHOT_VERSION:
+        try:
+            return append_snapshot(df, meta, source, directory)
+        except (SnapshotMismatch, pl.exceptions.PolarsError):
+            pass
+
+    return rebuild_snapshot(source, directory)
+
+
+def load_snapshot_or_source(source=DATA_SOURCE, directory=SNAPSHOT_DIR):
+    """(frame, metadata) of the on-disk snapshot when it is fresh, otherwise refreshed from the source"""
+    df, meta = read_snapshot(directory)
+    if df is not None and snapshot_is_fresh(meta, source):
+        return df, meta
+
+    # Only one process ingests; the others keep serving what they have, or
+    # wait for its snapshot when there is nothing to serve yet
+    with refresh_lock(directory, wait=df is None) as locked:
+        if not locked:
+            return df, meta
+
+        latest, meta = read_snapshot(directory)
+        if latest is not None and snapshot_is_fresh(meta, source):
+            return latest, meta
+
+        try:
+            return refresh_snapshot(source, directory)
+        except Exception:
+            # Offline or the source is broken: a stale snapshot beats no data
+            if latest is not None:
+                return latest, meta
+            raise
+
+
+class Dataset:
+    """One consistent version of the loaded data with every structure built from it
+
+    Built off the request path and swapped in whole, so a rerun that holds a
+    Dataset reads facts, companies, indexes and aggregates of the same version.
+    One instance is shared by every session in the process (no per-rerun
+    copies): the facts are the memory-mapped snapshot buffers, and the date,
+    month and symbol lookups hand out slices of them. Treat every frame here
+    as read-only.
+    """
+
+    def __init__(self, df: pl.DataFrame, version: str):
+        self.version = version
+        self.facts, self.companies = split_companies(df)
+        self.date_index = DateIndex(self.facts)
+        self.symbol_index = SymbolIndex(self.facts)
+        self.aggregates = AggregateStore(with_companies(self.facts, self.companies, CATEGORY_KEYS))
+
+
+def dataset_version(df: pl.DataFrame, meta=None) -> str:
+    """Key for one version of the data, so an unchanged refresh isn't rebuilt
+
+    A snapshot only grows by appended rows until it is rewritten under a new
+    generation, so the two identify its contents without reading the data;
+    only a frame that couldn't be snapshotted is hashed.
+    """
+    if meta and meta.get("generation"):
+        return f"{meta['generation']}-{meta['rows']}"
+    return f"{df.height}-{df.hash_rows().sum():016x}" if df.height else "empty"
+
+
+def initial_dataset(source=DATA_SOURCE, directory=SNAPSHOT_DIR) -> Dataset:
+    """Any current-format snapshot on disk, however old, so startup doesn't wait on the source
+
+    Snapshots written by an older preprocess() (other dtypes, unsorted dates)
+    aren't served; they go through the regular refresh instead.
+    """
+    df, meta = read_snapshot(directory)
+    if df is None or meta.get("version") != SNAPSHOT_VERSION:
+        df, meta = load_snapshot_or_source(source, directory)
+    return Dataset(df, dataset_version(df, meta))
+
+
+def refresh_dataset(current: Dataset, source=DATA_SOURCE, directory=SNAPSHOT_DIR):
+    """A new Dataset if the source has changed since `current`, otherwise None
+
+    The process holding the refresh lock checks the source on every call:
+    remote sources with a conditional request whatever the snapshot's age (an
+    unchanged file costs one 304), local ones by size and mtime. The other
+    processes pick up whatever snapshot it last published.
+    """
+    with refresh_lock(directory, wait=False) as locked:
+        df, meta = read_snapshot(directory)
+        if locked and (is_remote(source) or not snapshot_is_fresh(meta, source)):
+            df, meta = refresh_snapshot(source, directory)
+    if df is None or (meta is not None and meta.get("version") != SNAPSHOT_VERSION):
+        return None
+
+    version = dataset_version(df, meta)
+    if current is not None and version == current.version:
+        return None
+    return Dataset(df, version)
+
+
+def start_refresher(source=DATA_SOURCE, directory=SNAPSHOT_DIR, interval=REFRESH_INTERVAL) -> Refresher:
+    """A Refresher holding the current Dataset: first load inline, then re-ingests in the background"""
+    return Refresher(
+        lambda: initial_dataset(source, directory),
+        lambda current: refresh_dataset(current, source, directory),
+        interval,
+        name="trackhigh-refresh",
+    ).start()
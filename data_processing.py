@@ -1,8 +1,9 @@
 import polars as pl
-import streamlit as st
 from datetime import datetime, timedelta
 import numpy as np
 
+from profiling import profiled
+
 # def get_stock_highs(data, symbol):
 #     """Get all dates when a stock hit new 52-week highs"""
 #     stock_data = data[data['symbol'] == symbol]
@@ -44,3 +45,41 @@ def get_stock_highs(data: pl.DataFrame, search_symbol: str) -> tuple[pl.DataFram
     print(high_dates)
 
     return high_dates, stock_data
+
+
+@profiled()
+def summarize_stocks(data: pl.DataFrame, by="symbol", extra=()) -> pl.DataFrame:
+    """
+    Most Frequent Stocks aggregation in a single lazy group_by (no joins).
+    Works on raw rows or on summaries it produced earlier, which it merges:
+        Occurrences  — distinct dates (or summed Occurrences)
+        Series Type, Industry — first seen, unless they are group keys
+        Max Returns  — max of Returns, falling back to %chng, else 0
+    `extra` adds more aggregations to the same pass.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    query = data.lazy()
+    columns = query.collect_schema().names()
+
+    if 'Occurrences' in columns:
+        occurrences = pl.col('Occurrences').sum()
+    else:
+        occurrences = pl.col("Today's Date").n_unique().alias('Occurrences')
+
+    if 'Max Returns' in columns:
+        max_returns = pl.col('Max Returns').max()
+    elif 'Returns' in columns:
+        max_returns = pl.col('Returns').max().alias('Max Returns')
+    elif '%chng' in columns:
+        max_returns = pl.col('%chng').max().alias('Max Returns')
+    else:
+        max_returns = pl.lit(0).alias('Max Returns')
+
+    info = [pl.col(name).first() for name in ('Series Type', 'Industry') if name not in by]
+
+    return (
+        query
+        .group_by(by, maintain_order=True)
+        .agg([occurrences, *info, max_returns, *extra])
+        .collect()
+    )
@@ -0,0 +1,114 @@
+import json
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Bytes read from the network per chunk when streaming a download to disk
+CHUNK_SIZE = 1 << 20
+TIMEOUT = 60
+
+
+class UrllibTransport:
+    """Default HTTP transport
+
+    A transport has one method, `open(url, headers)`, returning a response with
+    `status`, `headers.get()` and `read(size)` that works as a context manager.
+    Swap in another one (e.g. pointing at a local http.server) through the
+    `transport` argument of the functions below.
+    """
+
+    def open(self, url, headers=None):
+        request = urllib.request.Request(str(url), headers=headers or {})
+        try:
+            return urllib.request.urlopen(request, timeout=TIMEOUT)
+        except urllib.error.HTTPError as e:
+            # Not Modified / Range Not Satisfiable are answers, not failures
+            if e.code in (304, 416):
+                return e
+            raise
+
+
+TRANSPORT = UrllibTransport()
+
+
+def validators(response) -> dict:
+    """ETag / Last-Modified of a response, to make the next request conditional"""
+    found = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    return {key: value for key, value in found.items() if value}
+
+
+def conditional_headers(known: dict) -> dict:
+    headers = {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    return headers
+
+
+def fetch(url, start=0, length=None, known=None, transport=None):
+    """(body, validators) for bytes `start`.. of `url`, or (None, validators) on 304 Not Modified
+
+    With `known` validators the request is conditional, so an unchanged source
+    costs one empty response instead of a download.
+    """
+    headers = conditional_headers(known or {})
+    if start or length:
+        end = start + length - 1 if length else ""
+        headers["Range"] = f"bytes={start}-{end}"
+
+    with (transport or TRANSPORT).open(url, headers) as response:
+        if response.status == 304:
+            return None, {**(known or {}), **validators(response)}
+        if response.status == 416:
+            return b"", validators(response)
+        if start and response.status != 206:
+            # Server ignored the range and sends everything from byte 0
+            body = response.read()
+            return (body[start:start + length] if length else body[start:]), validators(response)
+        body = response.read(length) if length else response.read()
+        return body, validators(response)
+
+
+def download(url, path, transport=None, chunk_size=CHUNK_SIZE) -> dict:
+    """Stream `url` to `path` in chunks and return its validators
+
+    The body goes to `path.part` first. If a previous download was cut off,
+    it resumes from the end of the partial file, as long as the server still
+    serves the same version (If-Range); otherwise it starts over.
+    """
+    path = Path(path)
+    part = path.with_name(path.name + ".part")
+    part_meta = path.with_name(path.name + ".part.json")
+
+    headers = {}
+    done = part.stat().st_size if part.exists() else 0
+    known = json.loads(part_meta.read_text()) if done and part_meta.exists() else {}
+    if done and (known.get("etag") or known.get("last_modified")):
+        headers["Range"] = f"bytes={done}-"
+        headers["If-Range"] = known.get("etag") or known["last_modified"]
+    else:
+        done = 0
+
+    with (transport or TRANSPORT).open(url, headers) as response:
+        found = validators(response) or known
+        if response.status == 416:
+            # The partial file already holds the whole body
+            found = known
+        else:
+            resumed = response.status == 206
+            expected = response.headers.get("Content-Length")
+            part_meta.write_text(json.dumps(found))
+            with open(part, "ab" if resumed else "wb") as f:
+                received = 0
+                while chunk := response.read(chunk_size):
+                    f.write(chunk)
+                    received += len(chunk)
+            # The .part file stays behind so the next attempt can resume
+            if expected is not None and received != int(expected):
+                raise IOError(f"download of {url} cut off after {received} of {expected} bytes")
+
+    os.replace(part, path)
+    part_meta.unlink(missing_ok=True)
+    return found
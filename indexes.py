@@ -0,0 +1,82 @@
+from bisect import bisect_left
+from datetime import date
+
+import polars as pl
+
+
+def row_ranges(data: pl.DataFrame, column: str):
+    """(keys, starts, lengths) of each run of equal values in a frame grouped by `column`"""
+    runs = (
+        data
+        .select(column)
+        .with_row_index("row")
+        .drop_nulls(column)
+        .group_by(column, maintain_order=True)
+        .agg(pl.col("row").first().alias("start"), pl.len().alias("length"))
+    )
+    return runs[column].to_list(), runs["start"].to_list(), runs["length"].to_list()
+
+
+class DateIndex:
+    """Row ranges per trading day over a frame sorted by Today's Date, plus the month labels
+
+    Built once per dataset so the Specific Date filter becomes a slice instead
+    of evaluating a date cast over every row on each rerun (the Month and Date
+    Range views read AggregateStore). Only offsets are stored, the frame itself
+    is passed in when slicing.
+    """
+
+    def __init__(self, data: pl.DataFrame):
+        self.days, self.starts, lengths = row_ranges(
+            data.select(pl.col("Today's Date").dt.date().alias("day")), "day"
+        )
+        self.ends = [start + length for start, length in zip(self.starts, lengths)]
+
+        # Month labels in chronological order, because the days are
+        self.months = list(dict.fromkeys(day.strftime('%B %Y') for day in self.days))
+
+    @property
+    def min_date(self) -> date:
+        return self.days[0] if self.days else None
+
+    @property
+    def max_date(self) -> date:
+        return self.days[-1] if self.days else None
+
+    def for_date(self, data: pl.DataFrame, selected_date: date) -> pl.DataFrame:
+        """Rows for a single trading day"""
+        i = bisect_left(self.days, selected_date)
+        if i == len(self.days) or self.days[i] != selected_date:
+            return data.clear()
+        return data.slice(self.starts[i], self.ends[i] - self.starts[i])
+
+
+class SymbolIndex:
+    """Row order of every symbol's timeline over the shared frame
+
+    Gives the Search Stock view its option list and a stock's timeline
+    (newest first) without scanning the whole history on each rerun. Only the
+    row numbers are kept in symbol order, not a sorted copy of the data, so
+    the history stays in one set of (memory-mapped) buffers shared by every
+    session; a lookup gathers just that symbol's rows.
+    """
+
+    def __init__(self, data: pl.DataFrame):
+        self.data = data
+        order = (
+            data
+            .select("symbol", "Today's Date")
+            .with_row_index("row")
+            .sort(["symbol", "Today's Date"], descending=[False, True], nulls_last=True, maintain_order=True)
+        )
+        self.rows = order["row"]
+
+        self.symbols, starts, lengths = row_ranges(order, "symbol")
+        self.ranges = dict(zip(self.symbols, zip(starts, lengths)))
+
+    def for_symbol(self, symbol: str) -> pl.DataFrame:
+        """All rows for a symbol, newest first"""
+        if symbol not in self.ranges:
+            return self.data.clear()
+        start, length = self.ranges[symbol]
+        return self.data[self.rows.slice(start, length)]
@@ -0,0 +1,140 @@
+import contextvars
+import functools
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+# Append every recorded span to this JSON-lines file (off when unset)
+PROFILE_LOG = os.environ.get("TRACKHIGH_PROFILE_LOG")
+
+# Spans of the rerun being recorded on this thread, None when profiling is off
+_current = contextvars.ContextVar("trackhigh_profile", default=None)
+
+
+def rss_bytes():
+    """Resident set size of the process from /proc, or None where that isn't available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _rows(values):
+    """Row count of the first DataFrame-like value, if any"""
+    for value in values:
+        if hasattr(value, "height"):
+            return value.height
+    return None
+
+
+class Span:
+    """One timed stage: wall time, rows in/out and the resident memory it added"""
+
+    def __init__(self, spans, name, rows_in=None):
+        self._spans = spans
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+
+    def __enter__(self):
+        self._depth = sum(1 for span in self._spans if span.get("open"))
+        self._record = {"name": self.name, "open": True}
+        self._spans.append(self._record)
+        self._rss = rss_bytes()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        rss = rss_bytes()
+        self._record.update({
+            "depth": self._depth,
+            "ms": seconds * 1000,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "bytes": rss - self._rss if rss is not None and self._rss is not None else None,
+        })
+        del self._record["open"]
+        return False
+
+
+class _NoSpan:
+    """Shared stand-in while profiling is off: entering it and setting rows cost nothing"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+def span(name, rows_in=None):
+    """Context manager timing one stage of the current rerun; set `.rows_out` inside it"""
+    spans = _current.get()
+    if spans is None:
+        return NO_SPAN
+    return Span(spans, name, rows_in)
+
+
+def profiled(name=None):
+    """Decorator recording a span per call, with rows in/out taken from DataFrame arguments and results"""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(label, rows_in=_rows(args)) as timed:
+                result = fn(*args, **kwargs)
+                timed.rows_out = _rows((result,))
+            return result
+        return wrapper
+    return decorate
+
+
+class Profile:
+    """Spans recorded for one rerun, plus context (e.g. the view) stored with them in the log"""
+
+    def __init__(self, **context):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.context = context
+        self.spans = []
+
+    def export(self, path):
+        """Append one JSON line per span"""
+        base = {"run_id": self.run_id, "time": self.started_at, **self.context}
+        with open(path, "a") as f:
+            for record in self.spans:
+                f.write(json.dumps({**base, **record}, default=str) + "\n")
+
+
+@contextmanager
+def recording(enabled=True, log_path=PROFILE_LOG, **context):
+    """Record the spans of the enclosed block; yields a Profile, or None when disabled"""
+    if not enabled:
+        yield None
+        return
+
+    profile = Profile(**context)
+    token = _current.set(profile.spans)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        if log_path and profile.spans:
+            try:
+                profile.export(log_path)
+            except OSError:
+                pass
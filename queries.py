@@ -0,0 +1,117 @@
+import polars as pl
+
+from aggregates import filter_period
+from profiling import profiled
+
+# Card sort options, in sidebar order -> (column, descending). Nulls always sort last.
+SORT_OPTIONS = {
+    "Returns (High to Low)": ("Returns", True),
+    "Mcap (low to high)": ("Market Cap", False),
+    "P/E (low to high)": ("P/E Ratio", False),
+    "Days Since New High (High to low)": ("Days Since High", True),
+}
+
+
+class StockQuery:
+    """The sidebar selections for a set of stock rows, compiled into one lazy query
+
+    Each step (company join, Sector/Series filters, sort) returns a new query
+    without touching any data. Nothing runs until a view asks for the summary,
+    the filter options or a page of rows, so Polars sees the whole
+    filter -> sort -> slice plan and only materializes what is shown.
+    """
+
+    def __init__(self, frame, sort=None):
+        self._query = frame.lazy()
+        self._sort = sort
+
+    def with_companies(self, companies: pl.DataFrame) -> "StockQuery":
+        """Join the company profile columns onto the rows by symbol"""
+        if companies.is_empty():
+            return self
+        joined = self._query.join(companies.lazy(), on="symbol", how="left", maintain_order="left")
+        return StockQuery(joined, self._sort)
+
+    def where(self, selected_sectors="All", selected_series="All") -> "StockQuery":
+        """Keep rows matching the Sector (Industry) and Series selections"""
+        return StockQuery(filter_period(self._query, selected_sectors, selected_series), self._sort)
+
+    def sort_by(self, sort_option) -> "StockQuery":
+        """Order rows by a card sort option; unknown options and "None" keep the row order"""
+        return StockQuery(self._query, SORT_OPTIONS.get(sort_option))
+
+    def cached(self) -> "StockQuery":
+        """Run the plan so far once and continue from its result
+
+        For the steps every later collect shares (the day slice and company
+        join), so the options, the summary and the page don't each run them.
+        """
+        return StockQuery(self._query.collect(), self._sort)
+
+    @profiled("query.options")
+    def options(self, *columns) -> dict:
+        """Sorted distinct non-null values per column, for the sidebar selectboxes, collected together"""
+        plans = [self._query.select(pl.col(column).drop_nulls().unique()) for column in columns]
+        return {column: sorted(values[column].to_list()) for column, values in zip(columns, pl.collect_all(plans))}
+
+    def _summary_plan(self) -> pl.LazyFrame:
+        returns = "Returns" if "Returns" in self._query.collect_schema().names() else "pChange"
+        return self._query.select(
+            pl.len().alias("rows"),
+            pl.col("symbol").n_unique().alias("stocks"),
+            pl.col("Industry").n_unique().alias("sectors"),
+            pl.col(returns).cast(pl.Float64).mean().alias("average"),
+        )
+
+    @profiled("query.summary")
+    def summary(self) -> dict:
+        """Row count and the Total Stocks / Total Sectors / Average Change metrics"""
+        return self._summary_plan().collect().row(0, named=True)
+
+    def _sorted(self) -> pl.LazyFrame:
+        if self._sort is None:
+            return self._query
+        column, descending = self._sort
+        if column not in self._query.collect_schema().names():
+            return self._query
+        return self._query.sort(column, descending=descending, nulls_last=True, maintain_order=True)
+
+    def _page_plan(self, offset, length) -> pl.LazyFrame:
+        """Only the rows of one page, after filters and sort
+
+        A sorted page is a top-k selection of the first offset + length rows
+        instead of a full sort, so deeper pages extend k as the user pages on.
+        Missing values, then the original row order, break ties exactly like
+        the stable nulls-last sort in collect(). Without a `length`, every row
+        from `offset` on.
+        """
+        column = self._sort[0] if self._sort else None
+        if length is None or column not in self._query.collect_schema().names():
+            return self._sorted().slice(offset, length)
+
+        descending = self._sort[1]
+        keys = [pl.col(column).is_null(), pl.col(column), pl.col("__row")]
+        order = [False, descending, False]
+        return (
+            self._query
+            .with_row_index("__row")
+            .bottom_k(offset + length, by=keys, reverse=order)
+            .sort(keys, descending=order)
+            .slice(offset, length)
+            .drop("__row")
+        )
+
+    @profiled("query.page")
+    def page(self, offset, length) -> pl.DataFrame:
+        """Collect only the rows of one page, after filters and sort"""
+        return self._page_plan(offset, length).collect()
+
+    @profiled("query.summary_and_page")
+    def summary_and_page(self, offset=0, length=None):
+        """(summary, page) from one collect_all, so their shared filters run once"""
+        summary, page = pl.collect_all([self._summary_plan(), self._page_plan(offset, length)])
+        return summary.row(0, named=True), page
+
+    def collect(self) -> pl.DataFrame:
+        """Every matching row, sorted"""
+        return self._sorted().collect()
@@ -0,0 +1,48 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Refresher:
+    """Keeps a value current by rebuilding it on a background thread
+
+    `load()` builds the first value on the calling thread. After that,
+    `refresh(current)` runs every `interval` seconds off the request path and
+    returns either a new value or None when nothing changed. A new value
+    replaces the old one with a single attribute assignment, so readers
+    always see one complete value and never wait for a rebuild.
+    """
+
+    def __init__(self, load, refresh, interval: float, name="refresher"):
+        self._refresh = refresh
+        self.interval = interval
+        self.current = load()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh_now(self) -> bool:
+        """Run one refresh on the calling thread; True if a new value was swapped in"""
+        value = self._refresh(self.current)
+        if value is None:
+            return False
+        self.current = value
+        return True
+
+    def _run(self):
+        # First pass right away: load() may have served a stale snapshot
+        while True:
+            try:
+                self.refresh_now()
+            except Exception:
+                # Keep serving the last good value and try again next time
+                logger.exception("Background refresh failed")
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,283 @@
+"""HTTP service for the dashboard queries, without Streamlit
+
+Serves the Specific Date, Month, Date Range and Search Stock queries of
+api.py as JSON, or the rows alone as an Arrow IPC stream:
+
+    python server.py --port 8502
+    curl 'localhost:8502/date?day=2024-05-02&sector=Banks&sort=Returns (High to Low)&limit=25'
+    curl 'localhost:8502/month?month=May 2024&format=arrow' > may.arrows
+    curl 'localhost:8502/range?start=2024-01-01&end=2024-06-30&series=EQ'
+    curl 'localhost:8502/symbol?symbol=RELIANCE'
+    curl 'localhost:8502/meta'
+
+It shares the snapshot cache directory with the Streamlit app, so it can run
+next to `streamlit run main.py` or on its own. Every request reads the
+current Dataset once; responses are cached per dataset version.
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import polars as pl
+
+import api
+from aggregates import category_counts, DISTRIBUTION_CATEGORIES
+from data_loader import start_refresher
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+CACHE_ENTRIES = 256
+
+
+class BadRequest(Exception):
+    pass
+
+
+class ResponseCache:
+    """Encoded responses, least recently used first, for one dataset version at a time
+
+    Keys include the dataset version, so a refresh never serves stale
+    results; the first request after a refresh drops the old entries.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, version, key, entry):
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _date(params, name) -> date:
+    try:
+        return date.fromisoformat(params[name])
+    except KeyError:
+        raise BadRequest(f"missing parameter: {name}")
+    except ValueError:
+        raise BadRequest(f"{name} must be an ISO date (YYYY-MM-DD)")
+
+
+def _int(params, name, default=None):
+    if name not in params:
+        return default
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if value < 0:
+        raise BadRequest(f"{name} must not be negative")
+    return value
+
+
+def _filters(params) -> dict:
+    return {"sector": params.get("sector", "All"), "series": params.get("series", "All")}
+
+
+def _categories(result, params) -> dict:
+    category = params.get("category", "Industry")
+    if category not in DISTRIBUTION_CATEGORIES:
+        raise BadRequest(f"category must be one of {DISTRIBUTION_CATEGORIES}")
+    counts = category_counts(result.categories, category)
+    return dict(zip(counts[category].to_list(), counts["count"].to_list()))
+
+
+def query_date(dataset, params):
+    sort = params.get("sort", "None")
+    if sort not in api.DATE_SORT_OPTIONS:
+        raise BadRequest(f"sort must be one of {api.DATE_SORT_OPTIONS}")
+    result = api.by_date(dataset, _date(params, "day"), sort=sort, **_filters(params))
+    summary, rows = result.summary_and_page(_int(params, "offset", 0), _int(params, "limit"))
+    return {"summary": summary, "categories": _categories(result, params)}, rows
+
+
+def _period(result, params):
+    if result.sort not in api.PERIOD_SORT_OPTIONS:
+        raise BadRequest(f"sort must be one of {list(api.PERIOD_SORT_OPTIONS)}")
+    return {"summary": result.metrics(), "categories": _categories(result, params)}, result.table()
+
+
+def query_month(dataset, params):
+    if "month" not in params:
+        raise BadRequest("missing parameter: month")
+    return _period(api.by_month(dataset, params["month"], sort=params.get("sort", "Returns (High to Low)"),
+                                **_filters(params)), params)
+
+
+def query_range(dataset, params):
+    result = api.by_range(dataset, _date(params, "start"), _date(params, "end"),
+                          sort=params.get("sort", "Returns (High to Low)"), **_filters(params))
+    return _period(result, params)
+
+
+def query_symbol(dataset, params):
+    if "symbol" not in params:
+        raise BadRequest("missing parameter: symbol")
+    rows = api.by_symbol(dataset, params["symbol"])
+    return {"summary": {"rows": rows.height}}, rows
+
+
+def query_meta(dataset, params):
+    index = dataset.date_index
+    return {
+        "min_date": index.min_date,
+        "max_date": index.max_date,
+        "months": index.months,
+        "symbols": len(dataset.symbol_index.symbols),
+        "date_sort_options": api.DATE_SORT_OPTIONS,
+        "period_sort_options": list(api.PERIOD_SORT_OPTIONS),
+    }, None
+
+
+ROUTES = {
+    "/date": query_date,
+    "/month": query_month,
+    "/range": query_range,
+    "/symbol": query_symbol,
+    "/meta": query_meta,
+}
+
+
+def source_precision(rows: pl.DataFrame) -> pl.DataFrame:
+    """Float32 ratio columns back as the 2-decimal Float64 values of the source file"""
+    narrow = [name for name, dtype in rows.schema.items() if dtype == pl.Float32]
+    return rows.with_columns(pl.col(narrow).cast(pl.Float64).round(2)) if narrow else rows
+
+
+def encode(dataset, fields, rows, fmt):
+    """(content type, body, extra headers) for a query result"""
+    if rows is not None:
+        # Widened as is, 6.99 would go out as 6.989999771118164
+        rows = source_precision(rows)
+    if fmt == "arrow":
+        if rows is None:
+            raise BadRequest("this endpoint has no rows to stream as Arrow")
+        buffer = io.BytesIO()
+        rows.write_ipc_stream(buffer)
+        # The metrics travel in a header so the body stays a plain Arrow stream
+        header = json.dumps(fields, default=_json_default)
+        return ARROW_STREAM, buffer.getvalue(), {"X-TrackHigh-Summary": header}
+
+    payload = {"version": dataset.version, **fields}
+    if rows is not None:
+        payload["rows"] = rows.to_dicts()
+    return "application/json", json.dumps(payload, default=_json_default).encode(), {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "TrackHigh"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/meta"
+        route = ROUTES.get(path)
+        if route is None:
+            return self._error(404, f"unknown path: {url.path}")
+
+        params = dict(parse_qsl(url.query))
+        fmt = params.pop("format", None)
+        if fmt is None:
+            fmt = "arrow" if ARROW_STREAM in self.headers.get("Accept", "") else "json"
+        if fmt not in ("json", "arrow"):
+            return self._error(400, "format must be json or arrow")
+
+        # One Dataset for the whole request, even if a refresh swaps it meanwhile
+        dataset = self.server.refresher.current
+        key = (path, tuple(sorted(params.items())), fmt)
+        entry = self.server.cache.get(dataset.version, key)
+        if entry is None:
+            try:
+                fields, rows = route(dataset, params)
+                content_type, body, headers = encode(dataset, fields, rows, fmt)
+            except BadRequest as e:
+                return self._error(400, str(e))
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            entry = (content_type, body, headers, etag)
+            self.server.cache.put(dataset.version, key, entry)
+
+        content_type, body, headers, etag = entry
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message):
+        body = json.dumps({"error": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+def make_server(host="127.0.0.1", port=8502, refresher=None, cache_entries=CACHE_ENTRIES):
+    """A ThreadingHTTPServer over the shared Dataset; call serve_forever() on it"""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.refresher = refresher or start_refresher()
+    server.cache = ResponseCache(cache_entries)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--cache-entries", type=int, default=CACHE_ENTRIES, help="responses kept in memory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = make_server(args.host, args.port, cache_entries=args.cache_entries)
+    logger.info("Serving TrackHigh queries on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+import streamlit as st
+
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Every stylesheet the app uses, in cascade order. Components only reference
+# the classes defined here. The files are served from app/static/ when static
+# serving is enabled (see .streamlit/config.toml) and inlined otherwise.
+STYLESHEETS = ["trackhigh.css"]
+
+
+@lru_cache(maxsize=None)
+def stylesheet_tags(static_serving: bool) -> str:
+    """<link> tags for the registered stylesheets, or one inline <style> block as a fallback"""
+    if not static_serving:
+        css = "\n".join((STATIC_DIR / name).read_text() for name in STYLESHEETS)
+        return f"<style>\n{css}\n</style>"
+
+    tags = []
+    for name in STYLESHEETS:
+        # Content hash in the URL so browsers cache the file until it changes
+        version = hashlib.sha1((STATIC_DIR / name).read_bytes()).hexdigest()[:12]
+        tags.append(f'<link rel="stylesheet" href="app/static/{name}?v={version}">')
+    return "".join(tags)
+
+
+def inject_styles():
+    """Reference the app stylesheet; call once at the top of every rerun"""
+    st.markdown(stylesheet_tags(bool(st.get_option("server.enableStaticServing"))), unsafe_allow_html=True)
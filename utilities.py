@@ -30,4 +30,28 @@ def format_number(num):
         else:
             return f"₹{num:,.2f}"
     except (ValueError, TypeError):
-        return "N/A"
\ No newline at end of file
+        return "N/A"
+
+def format_fixed_expr(expr: pl.Expr, precision=2, thousands=False) -> pl.Expr:
+    """Vectorized f"{value:.2f}" (or f"{value:,.2f}") for a numeric Polars expression"""
+    scale = 10 ** precision
+    scaled = (expr.abs() * scale).round(0).cast(pl.Int64)
+    whole = (scaled // scale).cast(pl.Utf8)
+    if thousands:
+        # Insert a comma every three digits from the right
+        whole = whole.str.reverse().str.replace_all(r"(\d{3})", "$1,").str.strip_chars_end(",").str.reverse()
+    sign = pl.when(expr < 0).then(pl.lit("-")).otherwise(pl.lit(""))
+    if precision == 0:
+        return pl.concat_str([sign, whole])
+    fraction = (scaled % scale).cast(pl.Utf8).str.zfill(precision)
+    return pl.concat_str([sign, whole, pl.lit("."), fraction])
+
+def format_number_expr(expr: pl.Expr) -> pl.Expr:
+    """Vectorized format_number for a numeric Polars expression"""
+    return (
+        pl.when(expr.is_null()).then(pl.lit("N/A"))
+        .when(expr >= 1e9).then(pl.format("₹{}B", format_fixed_expr(expr / 1e9)))
+        .when(expr >= 1e7).then(pl.format("₹{}Cr", format_fixed_expr(expr / 1e7)))
+        .when(expr >= 1e5).then(pl.format("₹{}L", format_fixed_expr(expr / 1e5)))
+        .otherwise(pl.format("₹{}", format_fixed_expr(expr, thousands=True)))
+    )